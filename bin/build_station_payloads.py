@@ -2,6 +2,7 @@
 """Build payloads from Synoptic and XMACIS responses."""
 import argparse
 import json
+import logging
 import sys
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -14,6 +15,13 @@ if str(ROOT_DIR) not in sys.path:
 from bin.fetch_synoptic_data import fetch_synoptic_data
 from src.data_processor import build_station_payload, climate_day_window
 
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - fallback for older Python
+    from backports.zoneinfo import ZoneInfo  # type: ignore
+
+log = logging.getLogger(__name__)
+
 # Global flag to determine which paths to use
 USE_DEV_PATHS = True  # Set to False for production
 
@@ -33,18 +41,18 @@ else:
     YESTERDAY_RSYNC_PATH = Path("/data/ldad/CmsRsyncManager/data/incoming/PublicData/climateWeb/station_payloads_yesterday.json")
 
 
-def _format_day_label(day_start: datetime) -> str:
-    try:
-        from zoneinfo import ZoneInfo
-    except ImportError:  # pragma: no cover
-        from backports.zoneinfo import ZoneInfo  # type: ignore
+try:
+    _PACIFIC = ZoneInfo("America/Los_Angeles")
+except Exception:  # pragma: no cover - missing tz database
+    _PACIFIC = None
 
-    try:
-        pacific = ZoneInfo("America/Los_Angeles")
-        return day_start.astimezone(pacific).strftime("%Y-%m-%d")
-    except Exception:
+
+def _format_day_label(day_start: datetime) -> str:
+    if _PACIFIC is None:
         return day_start.strftime("%Y-%m-%d")
 
+    return day_start.astimezone(_PACIFIC).strftime("%Y-%m-%d")
+
 
 def _should_archive(current_day_label: str, now: datetime) -> bool:
     """Check if we need to archive at 0900 on the new climate day."""
@@ -189,7 +197,7 @@ def main() -> None:
     if _should_archive(current_day_label, now):
         try:
             # Generate yesterday's payload explicitly using yesterday's OSO cache
-            print(f"New climate day detected, generating yesterday's payload...")
+            log.info("New climate day detected, generating yesterday's payload...")
             
             _archive_oso_cache()
             stationsA, stationsB, stationsC = fetch_synoptic_data(current_time=now)
@@ -229,14 +237,16 @@ def main() -> None:
             # Write yesterday's payload
             YESTERDAY_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
             YESTERDAY_OUTPUT_PATH.write_text(json.dumps(yesterday_payload, indent=2), encoding="utf-8")
-            print(f"Generated yesterday's payload: {YESTERDAY_OUTPUT_PATH}")
+            log.info("Generated yesterday's payload: %s", YESTERDAY_OUTPUT_PATH)
             
             if not USE_DEV_PATHS:
                 YESTERDAY_RSYNC_PATH.parent.mkdir(parents=True, exist_ok=True)
                 YESTERDAY_RSYNC_PATH.write_text(json.dumps(yesterday_payload, indent=2), encoding="utf-8")
                 
         except Exception as e:
-            print(f"Warning: Could not generate yesterday's payload: {e}")
+            log.warning("Warning: Could not generate yesterday's payload: %s", e)
+    else:
+        log.info("Skipped yesterday's payload: no climate day transition")
 
     # Write today's payload
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -246,8 +256,9 @@ def main() -> None:
         RSYNC_PATH.parent.mkdir(parents=True, exist_ok=True)
         RSYNC_PATH.write_text(json.dumps(today_payload, indent=2), encoding="utf-8")
 
-    print(f"Saved station payload to {OUTPUT_PATH}")
+    log.info("Saved station payload to %s", OUTPUT_PATH)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     main()
@@ -3,6 +3,7 @@
 import sys
 import yaml
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Any, Dict
 
@@ -59,6 +60,13 @@ def fetch_xmacis_precip(station: str, now: datetime | None = None) -> Dict[str,
     start = start_of_water_year_iso(current)
     end = current.strftime("%Y-%m-%d")
 
+    return _fetch_summary(station, start, end)
+
+
+# Keyed on the actual request, so today's and yesterday's payloads built in
+# the same run share one round trip per station. Failures are not cached.
+@lru_cache(maxsize=1024)
+def _fetch_summary(station: str, start: str, end: str) -> Dict[str, Any]:
     client = XMACISClient()
 
     def _request(station_id: str) -> Dict[str, Any]:
@@ -1,24 +1,50 @@
 import numpy as np
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 import json
+import logging
+import math
 import os
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from bin.fetch_xmacis_precip import fetch_xmacis_precip
 
 try:
-    from zoneinfo import ZoneInfo
-except ImportError:  # pragma: no cover - fallback for older Python
-    from backports.zoneinfo import ZoneInfo  # type: ignore
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 
 ### Global flag to determine which paths to use ###
 USE_DEV_PATHS = True  # Set to False for production
 
+log = logging.getLogger(__name__)
+
+if USE_DEV_PATHS:
+    _MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+    _HOME_DIR = os.path.dirname(_MODULE_DIR)  # Go up one level from src/ to project root
+else:
+    _HOME_DIR = "/ldad/localapps/climateWeb/db"
+
+# Stations are formatted concurrently; the HTTP and file I/O releases the GIL.
+_MAX_WORKERS = 16
+
+# Serializes the OSO cache read-modify-write across worker threads.
+_OSO_CACHE_LOCK = threading.Lock()
+
+
 def mm_to_in(mm):
     if mm is None:
         return None
-    return np.round(mm / 25.4, decimals=2)
+    inches = mm / 25.4
+    if not math.isfinite(inches):
+        return inches  # NaN/inf pass through, as np.round did
+    # Same scale/rint/unscale steps as np.round(x, 2), without ufunc dispatch on a scalar
+    return round(inches * 100) / 100
 
 
 def c_to_f(c):
@@ -31,6 +57,66 @@ def _parse_dt(dt_str: str) -> datetime:
     return datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
 
 
+def _parse_dt_array(timestamps: Any) -> np.ndarray:
+    """Parse ``YYYY-MM-DDTHH:MM:SSZ`` strings into a naive-UTC ``datetime64[s]`` array.
+
+    Arrays that are already parsed are returned unchanged so one station's
+    time axis can be shared by all of its observation series.
+    """
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == "M":
+        return timestamps
+    if timestamps is None:
+        timestamps = []
+    return np.array([t.rstrip("Z") for t in timestamps], dtype="datetime64[s]")
+
+
+# Every station in a build shares the same window bounds, so each converts once.
+@lru_cache(maxsize=32)
+def _to_dt64(dt: datetime) -> np.datetime64:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(dt, "s")
+
+
+@lru_cache(maxsize=32)
+def _to_iso_z(dt: datetime) -> str:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _bisect_times(timestamps: Any, dt: datetime, side: str = "left") -> int:
+    """Insertion point of ``dt`` in time-ordered timestamps.
+
+    Zero-padded UTC ``...Z`` strings sort chronologically, so raw string lists
+    are bisected without parsing; parsed ``datetime64`` arrays use searchsorted.
+    """
+    if isinstance(timestamps, np.ndarray):
+        return int(np.searchsorted(timestamps, _to_dt64(dt), side=side))
+    key = _to_iso_z(dt)
+    return bisect_left(timestamps, key) if side == "left" else bisect_right(timestamps, key)
+
+
+def _in_time_order(timestamps: Any, values: Any) -> Tuple[Any, Any]:
+    """Return ``timestamps`` and ``values`` sorted by time for ``_bisect_times``.
+
+    Ordered input (the usual Synoptic case) is returned unchanged after one
+    linear check; otherwise both are reordered along the parsed time axis.
+    """
+    if isinstance(timestamps, np.ndarray):
+        ordered = bool(np.all(timestamps[:-1] <= timestamps[1:]))
+    else:
+        ordered = all(a <= b for a, b in zip(timestamps, timestamps[1:]))
+    if ordered:
+        return timestamps, values
+
+    parsed = _parse_dt_array(timestamps)
+    order = np.argsort(parsed, kind="stable")
+    if isinstance(values, np.ndarray):
+        return parsed[order], values[order]
+    return parsed[order], [values[i] for i in order]
+
+
 def get_midnight(now: datetime | None = None) -> datetime:
     if now is None:
         now = datetime.now(timezone.utc)
@@ -52,9 +138,16 @@ def climate_day_window(now: datetime, days_ago: int = 0) -> Tuple[datetime, date
     return start, end
 
 
+# Returned as-is when ACIS has no summary for a station: (wy_in, norm_in, pct).
+_ACIS_MISSING = (9999, 9999, 9999)
+
+
 def _get_precip_from_acis(stid: str, now: datetime) -> Tuple[float, float, int]:
     acis = fetch_xmacis_precip(stid, now=now)  # expected: acis[0] = wy_in, acis[1] = norm_in
-    print(stid)
+    log.debug("ACIS precip fetched for %s", stid)
+
+    if not acis:
+        return _ACIS_MISSING
 
     def _safe_val(x: Any) -> float:
         try:
@@ -62,7 +155,7 @@ def _get_precip_from_acis(stid: str, now: datetime) -> Tuple[float, float, int]:
         except (TypeError, ValueError):
             return 9999
 
-    wy_raw  = acis[0] if len(acis) > 0 else None
+    wy_raw  = acis[0]
     norm_raw = acis[1] if len(acis) > 1 else None
 
     wy_in   = _safe_val(wy_raw)
@@ -76,47 +169,58 @@ def _get_precip_from_acis(stid: str, now: datetime) -> Tuple[float, float, int]:
     return wy_in, norm_in, pct
 
 
+# Drops in a cumulative precip series larger than this (mm) are treated as gauge resets.
+# The epsilon keeps a one-tip drop (e.g. 4.572 -> 4.318) from tripping on float error.
+_CUMULATIVE_RESET_TOL = 0.254 + 1e-6
+
+
 def _compute_daily_from_cumulative(
     cumulative_obs: Any,
     fallback_time: Any,
     day_start: datetime,
     day_end: datetime,
 ) -> Optional[float]:
-    entries: List[Tuple[str, Optional[float]]] = []
-
     if cumulative_obs is None:
-        entries = [(t, None) for t in fallback_time or []]
-    else:
-        entries = list(zip(fallback_time or [], cumulative_obs))
+        return None
 
-    if not entries:
+    times = fallback_time if fallback_time is not None else []
+    n = min(len(times), len(cumulative_obs))
+    if n == 0:
         return None
 
     # Include observations up to 30 minutes after day_end (0800-0830) in the previous day
     grace_period = timedelta(minutes=30)
     effective_day_end = day_end + grace_period
 
-    def _latest_before(target: datetime) -> Optional[float]:
-        for dt_str, val in reversed(entries):
-            dt = _parse_dt(dt_str)
-            if dt <= target:
-                return val
+    # Synoptic returns observations in time order, so the last one at or before
+    # a target is found by binary search instead of a full comparison pass.
+    times, cumulative_obs = _in_time_order(times[:n], cumulative_obs[:n])
+    i_latest = min(_bisect_times(times, effective_day_end, side="right"), n) - 1
+    i_baseline = min(_bisect_times(times, day_start, side="right"), n) - 1
+    if i_baseline < 0:
         return None
 
-    latest_val = _latest_before(effective_day_end)
-    baseline_val = _latest_before(day_start)
+    latest_val = cumulative_obs[i_latest]
+    baseline_val = cumulative_obs[i_baseline]
 
     if latest_val is None or baseline_val is None:
         return None
 
     try:
         daily = float(latest_val) - float(baseline_val)
+        window = np.asarray(cumulative_obs[i_baseline:i_latest + 1], dtype=np.float64)  # None -> NaN
     except (TypeError, ValueError):
         return None
 
     if daily < 0:
         return None
 
+    # A gauge reset inside the window can leave the endpoints looking sane;
+    # missing readings are dropped so they cannot hide a drop across them.
+    window = window[~np.isnan(window)]
+    if (np.diff(window) < -_CUMULATIVE_RESET_TOL).any():
+        return None
+
     return daily
 
 
@@ -131,67 +235,43 @@ def _compute_precip_from_hourly(
     if period not in ("daily", "wateryear"):
         raise ValueError(f"period must be 'daily' or 'wateryear', got {period!r}")
 
-    entries: List[Tuple[str, Optional[float]]] = []
-
     if hourly is None:
-        entries = [(t, None) for t in fallback_time or []]
-    else:
-        entries = list(zip(fallback_time or [], hourly))
-
-    if not entries:
         return None
 
-    entries.sort(key=lambda item: item[0])
-
-    # Include observations up to 30 minutes after day_end (0800-0830) in the previous day
-    grace_period = timedelta(minutes=30)
-    effective_day_end = day_end + grace_period if period == "daily" else day_end
-
-    total = 0.0
-    has_any = False
-
-    for dt_str, val in entries:
-        dt = _parse_dt(dt_str)
-
-        if val is None:
-            continue
-
-        if period == "daily" and (dt < day_start or dt >= effective_day_end):
-            continue
+    times = fallback_time if fallback_time is not None else []
+    n = min(len(times), len(hourly))
+    values = np.asarray(hourly[:n], dtype=np.float64)  # None -> NaN
 
-        has_any = True
-        v = val if val >= 0.254 else 0.0
-        if v > 0.0:
-            total += v
+    if period == "daily":
+        # Include observations up to 30 minutes after day_end (0800-0830) in the previous day
+        effective_day_end = day_end + timedelta(minutes=30)
+        times, values = _in_time_order(times[:n], values)
+        values = values[_bisect_times(times, day_start):_bisect_times(times, effective_day_end)]
 
-    if not has_any:
+    selected = values[~np.isnan(values)]
+    if not selected.size:
         return None
 
-    return total
+    return float(selected[selected >= 0.254].sum())
 
 
 def unwrap_cumulative(values: Iterable[Optional[float]]) -> List[Optional[float]]:
-    out: List[Optional[float]] = []
-    prev: Optional[float] = None
-    total: float = 0.0
+    arr = np.asarray(list(values), dtype=np.float64)  # None -> NaN
+    if arr.size == 0:
+        return []
 
-    for v in values:
-        if v is None:
-            out.append(None)
-            continue
+    valid = ~np.isnan(arr)
+    observed = arr[valid]
 
-        if prev is None:
-            prev = v
-            out.append(0.0)
-            continue
+    # Accumulate only positive steps between consecutive valid samples so gauge
+    # resets (negative steps) do not subtract from the running total.
+    deltas = np.diff(observed, prepend=observed[:1])
+    np.clip(deltas, 0.0, None, out=deltas)
 
-        if v > prev:
-            total += (v - prev)
+    totals = np.full(arr.shape, np.nan)
+    totals[valid] = np.cumsum(deltas)
 
-        out.append(total)
-        prev = v
-
-    return out
+    return [None if np.isnan(x) else float(x) for x in totals]
 
 
 def _compute_daily_temp_range(
@@ -212,112 +292,91 @@ def _compute_daily_temp_range(
     grace_period = timedelta(minutes=30)
     effective_day_end = day_end + grace_period
 
-    def _iter_in_window(values: Any):
+    # All series share one time axis, so the day-window mask is built once.
+    times = _parse_dt_array(fallback_time)
+    in_window = (times >= _to_dt64(day_start)) & (times < _to_dt64(effective_day_end))
+
+    def _window_values(values: Any) -> np.ndarray:
         if values is None:
-            return
-        for t, v in zip(fallback_time or [], values):
-            if v is None:
-                continue
-            dt = _parse_dt(t)
-            if dt >= day_start and dt < effective_day_end:
-                yield v
-
-    hourly_vals = list(_iter_in_window(air_temp))
-    if not hourly_vals:
-        return None, None
+            return np.empty(0)
+        n = min(len(values), len(times))
+        arr = np.asarray(values[:n], dtype=np.float64)[in_window[:n]]
+        return arr[~np.isnan(arr)]
 
-    hourly_max: Optional[float] = max(hourly_vals)
-    hourly_min: Optional[float] = min(hourly_vals)
+    hourly_vals = _window_values(air_temp)
+    if not hourly_vals.size:
+        return None, None
 
-    max6_vals = list(_iter_in_window(maxT_6hr)) if maxT_6hr is not None else []
-    min6_vals = list(_iter_in_window(minT_6hr)) if minT_6hr is not None else []
+    # If hourMax and hourMin are provided from OSO, use them as the primary source
+    if hourMax is not None and hourMin is not None:
+        return hourMax, hourMin
 
-    max6: Optional[float] = max(max6_vals) if max6_vals else None
-    min6: Optional[float] = min(min6_vals) if min6_vals else None
+    # The 6-hour extremes only widen the hourly range, so reduce them together.
+    daily_max = float(np.concatenate((hourly_vals, _window_values(maxT_6hr))).max())
+    daily_min = float(np.concatenate((hourly_vals, _window_values(minT_6hr))).min())
 
-    def _pick_max(a: Optional[float], b: Optional[float]) -> Optional[float]:
-        if a is None:
-            return b
-        if b is None:
-            return a
-        return max(a, b)
+    return daily_max, daily_min
 
-    def _pick_min(a: Optional[float], b: Optional[float]) -> Optional[float]:
-        if a is None:
-            return b
-        if b is None:
-            return a
-        return min(a, b)
 
-    # If hourMax and hourMin are provided from OSO, use them as the primary source
-    if hourMax is not None and hourMin is not None:
-        daily_max = hourMax
-        daily_min = hourMin
-    else:
-        daily_max = _pick_max(hourly_max, max6)
-        daily_min = _pick_min(hourly_min, min6)
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
 
-    if daily_max is None or daily_min is None:
-        return None, None
 
-    return daily_max, daily_min
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 
 def _load_oso_cache(cache_file: str) -> Dict[str, Any]:
     """Load OSO cache from JSON file."""
     try:
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        pass
-    return {}
+        with open(cache_file, 'rb') as f:
+            return _json_loads(f.read())
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+        return {}
 
 
 def _save_oso_cache(cache_file: str, cache: Dict[str, Any]) -> None:
     """Save OSO cache to JSON file."""
     try:
-        with open(cache_file, 'w') as f:
-            json.dump(cache, f, indent=2)
-    except IOError:
+        with open(cache_file, 'wb') as f:
+            f.write(_json_dumps(cache))
+    except OSError:
         pass
 
 
-def _parse_oso_file(stid: str, now: datetime, home_dir: str, oso_cache_file: Optional[str] = None) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[str]]:
+# OSO product fields; each is looked up independently since their order in the file isn't fixed.
+_OSO_TIME_RE = re.compile(r'SA (\d{8})')
+_OSO_HI_RE = re.compile(r'HI\s+(\d+)')
+_OSO_LO_RE = re.compile(r'LO\s+(\d+)')
+_OSO_PCPN_RE = re.compile(r'PCPN\s+([\d.]+)')
+
+
+# Map station IDs to OSO file suffixes
+_OSO_FILE_SUFFIXES = {
+    'SFOC1': 'SFD',
+    'RWCC1': 'RWC',
+    'SARC1': 'SRF',
+    'OAMC1': 'OKL',
+}
+
+_OSO_MISSING = (None, None, None, None)
+
+
+def _read_oso_product(oso_file: str, now: datetime) -> Optional[Tuple[float, float, Optional[float], datetime]]:
     """
-    Parse OSO text file to extract accumulated daily high and low temps, and YTD precipitation.
-    Tracks hourly HI/LO values and returns the max HI and min LO since 0800 UTC.
-    Returns (hourMax, hourMin, ytd_precip, last_update) where temps are in Celsius and precip is in mm if data is fresh (<2 hours old), otherwise (None, None, None, None).
+    Read one OSO product and return (hi_c, lo_c, pcpn_mm, oso_time).
+    Returns None if the file is missing or malformed, or the data is more than 2 hours old.
     """
-    # Map station IDs to OSO file suffixes
-    stn_map = {
-        'SFOC1': 'SFD',
-        'RWCC1': 'RWC',
-        'SARC1': 'SRF',
-        'OAMC1': 'OKL',
-    }
-    
-    stn = stn_map.get(stid)
-    if stn is None:
-        return None, None, None, None
-    
-    if USE_DEV_PATHS:
-        oso_file = f"{home_dir}\\SFOOSO{stn}"
-        cache_file = oso_cache_file or f"{home_dir}\\oso_cache.json"
-    else:
-        oso_file = f"{home_dir}/SFOOSO{stn}"
-        cache_file = oso_cache_file or f"{home_dir}/oso_cache.json"
-    
-    # For current day, continue with normal OSO file parsing
     try:
         with open(oso_file, 'r') as f:
             content = f.read()
         
         # Parse the time from the format "SA MMDDhhmm"
-        import re
-        time_match = re.search(r'SA (\d{8})', content)
+        time_match = _OSO_TIME_RE.search(content)
         if not time_match:
-            return None, None, None, None
+            return None
         
         time_str = time_match.group(1)
         
@@ -337,15 +396,15 @@ def _parse_oso_file(stid: str, now: datetime, home_dir: str, oso_cache_file: Opt
         # Check if data is more than 2 hours old
         time_diff = now - oso_time
         if time_diff > timedelta(hours=2):
-            return None, None, None, None
+            return None
         
         # Extract HI and LO values (in Fahrenheit)
-        hi_match = re.search(r'HI\s+(\d+)', content)
-        lo_match = re.search(r'LO\s+(\d+)', content)
-        pcpn_match = re.search(r'PCPN\s+([\d.]+)', content)
+        hi_match = _OSO_HI_RE.search(content)
+        lo_match = _OSO_LO_RE.search(content)
+        pcpn_match = _OSO_PCPN_RE.search(content)
         
         if not hi_match or not lo_match or not pcpn_match:
-            return None, None, None, None
+            return None
         
         hi_f = float(hi_match.group(1))
         lo_f = float(lo_match.group(1))
@@ -358,11 +417,43 @@ def _parse_oso_file(stid: str, now: datetime, home_dir: str, oso_cache_file: Opt
         hi_c = (hi_f - 32) * 5 / 9
         lo_c = (lo_f - 32) * 5 / 9
         
+        return hi_c, lo_c, pcpn, oso_time
+        
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+
+
+def _parse_oso_batch(
+    stids: Iterable[str], now: datetime, home_dir: str, oso_cache_file: Optional[str] = None
+) -> Dict[str, Tuple[Optional[float], Optional[float], Optional[float], Optional[str]]]:
+    """
+    Parse the OSO products for every station in stids and fold them into the cache
+    with a single load/save. Returns {stid: (hourMax, hourMin, ytd_precip, last_update)}
+    with the same per-station values as _parse_oso_file.
+    """
+    results = {stid: _OSO_MISSING for stid in stids}
+    sep = "\\" if USE_DEV_PATHS else "/"
+
+    readings = {}
+    for stid in results:
+        stn = _OSO_FILE_SUFFIXES.get(stid)
+        if stn is None:
+            continue
+        reading = _read_oso_product(f"{home_dir}{sep}SFOOSO{stn}", now)
+        if reading is not None:
+            readings[stid] = reading
+
+    if not readings:
+        return results
+
+    cache_file = oso_cache_file or f"{home_dir}{sep}oso_cache.json"
+
+    with _OSO_CACHE_LOCK:
         # Load cache and get current climate day boundaries
         cache = _load_oso_cache(cache_file)
         day_start = get_midnight(now)
         day_key = day_start.strftime("%Y-%m-%d")
-        
+    
         # Check if we need to reset cache for a new climate day
         if cache:
             for station_data in cache.values():
@@ -371,41 +462,50 @@ def _parse_oso_file(stid: str, now: datetime, home_dir: str, oso_cache_file: Opt
                     if cached_day != day_key:
                         cache = {}
                     break
+    
+        for stid, (hi_c, lo_c, pcpn, oso_time) in readings.items():
+            # Initialize or get station's daily cache
+            if stid not in cache:
+                cache[stid] = {}
         
-        # Initialize or get station's daily cache
-        if stid not in cache:
-            cache[stid] = {}
-        
-        # Reset cache if we're on a new climate day
-        if 'day' not in cache[stid] or cache[stid]['day'] != day_key:
-            cache[stid] = {
-                'day': day_key,
-                'max_hi': hi_c,
-                'min_lo': lo_c,
-                'ytd_precip': pcpn,
-                'last_update': oso_time.isoformat()
-            }
-        else:
-            # Update accumulated max/min
-            old_max = cache[stid].get('max_hi', hi_c)
-            old_min = cache[stid].get('min_lo', lo_c)
-            old_precip = cache[stid].get('ytd_precip', pcpn)
-            cache[stid]['max_hi'] = max(old_max, hi_c)
-            cache[stid]['min_lo'] = min(old_min, lo_c)
-            cache[stid]['ytd_precip'] = pcpn if pcpn is not None else old_precip
-            cache[stid]['last_update'] = oso_time.isoformat()
+            # Reset cache if we're on a new climate day
+            if 'day' not in cache[stid] or cache[stid]['day'] != day_key:
+                cache[stid] = {
+                    'day': day_key,
+                    'max_hi': hi_c,
+                    'min_lo': lo_c,
+                    'ytd_precip': pcpn,
+                    'last_update': oso_time.isoformat()
+                }
+            else:
+                # Update accumulated max/min
+                old_max = cache[stid].get('max_hi', hi_c)
+                old_min = cache[stid].get('min_lo', lo_c)
+                old_precip = cache[stid].get('ytd_precip', pcpn)
+                cache[stid]['max_hi'] = max(old_max, hi_c)
+                cache[stid]['min_lo'] = min(old_min, lo_c)
+                cache[stid]['ytd_precip'] = pcpn if pcpn is not None else old_precip
+                cache[stid]['last_update'] = oso_time.isoformat()
         
+            # Accumulated daily max and min in Celsius, plus the last update timestamp
+            results[stid] = (cache[stid]['max_hi'], cache[stid]['min_lo'], cache[stid]['ytd_precip'], cache[stid]['last_update'])
+    
         # Save updated cache
         _save_oso_cache(cache_file, cache)
-        
-        # Return accumulated daily max and min in Celsius, plus the last update timestamp
-        return (cache[stid]['max_hi'], cache[stid]['min_lo'], cache[stid]['ytd_precip'], cache[stid]['last_update'])
-        
-    except (FileNotFoundError, ValueError, OSError):
-        return None, None, None, None
+
+    return results
+
+
+def _parse_oso_file(stid: str, now: datetime, home_dir: str, oso_cache_file: Optional[str] = None) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[str]]:
+    """
+    Parse OSO text file to extract accumulated daily high and low temps, and YTD precipitation.
+    Tracks hourly HI/LO values and returns the max HI and min LO since 0800 UTC.
+    Returns (hourMax, hourMin, ytd_precip, last_update) where temps are in Celsius and precip is in mm if data is fresh (<2 hours old), otherwise (None, None, None, None).
+    """
+    return _parse_oso_batch([stid], now, home_dir, oso_cache_file)[stid]
 
 def format_hads(
-    station: Dict[str, Any], *, day_start: datetime, day_end: datetime, now: datetime, is_current_day: bool = True, oso_cache_file: Optional[str] = None
+    station: Dict[str, Any], *, day_start: datetime, day_end: datetime, now: datetime, is_current_day: bool = True, oso_cache_file: Optional[str] = None, oso: Optional[Tuple[Any, ...]] = None
 ) -> Dict[str, Any]:
     observations = station.get("OBSERVATIONS", {})
 
@@ -414,22 +514,19 @@ def format_hads(
 
     date_time = observations.get("date_time") or []
     dt_latest = date_time[-1] if date_time else None
+    times = _parse_dt_array(date_time)
 
     # Try to get hourly temps from OSO file
     stid = station.get("STID", "")
 
-    import os
-    if USE_DEV_PATHS:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        home_dir = os.path.dirname(script_dir)  # Go up one level from src/ to project root
-    else:
-        home_dir = "/ldad/localapps/climateWeb/db"
-
-    hourMax, hourMin, ytd_precip, oso_datetime = _parse_oso_file(stid, now, home_dir, oso_cache_file)
+    # build_station_payload passes the station's entry from one batched OSO parse
+    if oso is None:
+        oso = _parse_oso_file(stid, now, _HOME_DIR, oso_cache_file)
+    hourMax, hourMin, ytd_precip, oso_datetime = oso
 
     daily_maxT, daily_minT = _compute_daily_temp_range(
         air_temp,
-        date_time,
+        times,
         hourMax=hourMax,
         hourMin=hourMin,
         day_start=day_start,
@@ -442,7 +539,7 @@ def format_hads(
 
     daily_accum = _compute_daily_from_cumulative(
         precip_accum,
-        date_time,
+        times,
         day_start,
         day_end,
     )
@@ -463,7 +560,8 @@ def format_hads(
     if wy_in_station is not None:
         # For current day, add daily_in to wy_in_station since ACIS doesn't have today's data yet
         # For yesterday, don't add daily_in because ACIS already includes it
-        if is_current_day:
+        # (nor when a gauge reset leaves today's amount unknown)
+        if is_current_day and daily_in is not None:
             wy_in = wy_in_station + daily_in
         else:
             wy_in = wy_in_station
@@ -514,7 +612,7 @@ def format_asos(
 
     daily_maxT, daily_minT = _compute_daily_temp_range(
         air_temp,
-        date_time,
+        _parse_dt_array(date_time),
         maxT_6hr,
         minT_6hr,
         day_start=day_start,
@@ -525,8 +623,9 @@ def format_asos(
     minF = c_to_f(daily_minT)
     currentF = c_to_f(air_temp[-1]) if air_temp else None
 
+    # Unpack the per-report dicts once into parallel value/time sequences
     precip_section = (station_b or {}).get("OBSERVATIONS", {}).get("precipitation", [])
-    hourly = [entry.get("total") for entry in precip_section]
+    hourly = np.array([entry.get("total") for entry in precip_section], dtype=np.float64)
     date_time_b = [entry.get("last_report") for entry in precip_section]
 
     daily_accum = _compute_precip_from_hourly(
@@ -565,6 +664,16 @@ def format_asos(
         }
 
 
+def _map_stations(func: Any, stations: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Apply ``func`` to each station on a thread pool, preserving input order."""
+    stations = list(stations)
+    if len(stations) <= 1:
+        return [func(station) for station in stations]
+
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(stations))) as pool:
+        return list(pool.map(func, stations))
+
+
 def build_station_payload(
     stations_a: List[Dict[str, Any]],
     stations_b: Optional[List[Dict[str, Any]]] = None,
@@ -575,17 +684,32 @@ def build_station_payload(
     now: datetime | None = None,
     is_current_day: bool = True,
     oso_cache_file: Optional[str] = None,
+    formatter: Optional[Callable[..., Dict[str, Any]]] = None,
 ) -> List[Dict[str, Any]]:
+    """Format every station of one type; ``formatter`` replaces format_hads/format_asos.
+
+    An injected formatter is called as ``formatter(station, **kw)`` for HADS and
+    ``formatter(station_a, station_b, **kw)`` for ASOS, where ``kw`` holds
+    ``day_start``, ``day_end``, ``now`` and ``is_current_day``. The OSO products
+    are only pre-parsed for the default format_hads.
+    """
     if type is None:
         raise ValueError("Type is required.")
 
     current = now or datetime.now(timezone.utc)
 
     if type == "HADS":
-        return [
-            format_hads(station, day_start=day_start, day_end=day_end, now=current, is_current_day=is_current_day, oso_cache_file=oso_cache_file)
-            for station in stations_a
-        ]
+        if formatter is not None:
+            return _map_stations(
+                lambda station: formatter(station, day_start=day_start, day_end=day_end, now=current, is_current_day=is_current_day),
+                stations_a,
+            )
+
+        oso = _parse_oso_batch([station.get("STID", "") for station in stations_a], current, _HOME_DIR, oso_cache_file)
+        return _map_stations(
+            lambda station: format_hads(station, day_start=day_start, day_end=day_end, now=current, is_current_day=is_current_day, oso_cache_file=oso_cache_file, oso=oso[station.get("STID", "")]),
+            stations_a,
+        )
 
     if type == "ASOS":
         if stations_b is None:
@@ -597,16 +721,17 @@ def build_station_payload(
                 f"(got {len(stations_a)} and {len(stations_b)})"
             )
 
-        return [
-            format_asos(
-                station_a,
-                station_b,
+        fmt = formatter or format_asos
+        return _map_stations(
+            lambda pair: fmt(
+                pair[0],
+                pair[1],
                 day_start=day_start,
                 day_end=day_end,
                 now=current,
                 is_current_day=is_current_day,
-            )
-            for station_a, station_b in zip(stations_a, stations_b)
-        ]
+            ),
+            zip(stations_a, stations_b),
+        )
 
     raise ValueError(f"Unknown type: {type!r}")
@@ -1,10 +1,21 @@
 """Pytest configuration shared across tests."""
 
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parent.parent
 ROOT_STR = str(ROOT)
 
 if ROOT_STR not in sys.path:
     sys.path.insert(0, ROOT_STR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_imports():
+    """Import the builder and format one label so tz database loading isn't billed to the first test."""
+    from bin.build_station_payloads import _format_day_label
+
+    _format_day_label(datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc))
@@ -1,138 +1,155 @@
 """Tests for archival and payload generation logic in build_station_payloads.py."""
 
 import json
+import logging
+import os
 import pytest
 from datetime import datetime, timezone
-from pathlib import Path
-from unittest.mock import patch, mock_open
-import tempfile
-import shutil
 
+import bin.build_station_payloads as builder
 from bin.build_station_payloads import (
     _should_archive,
     _format_day_label,
+    _parse_as_of,
     build_payloads,
 )
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
-@pytest.fixture
-def temp_output_dir():
-    """Create a temporary directory for output files."""
-    temp_dir = tempfile.mkdtemp()
-    yield Path(temp_dir)
-    shutil.rmtree(temp_dir)
 
+def _dumps(obj) -> bytes:
+    """Serialize fixture payloads to UTF-8 JSON bytes, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
 
-@pytest.fixture
-def sample_existing_payload():
-    """Create a sample existing payload structure."""
-    return {
-        "meta": {
-            "generatedAt": "2026-01-12T10:00:00+00:00",
-            "climateDayStart": "2026-01-12T08:00:00+00:00",
-            "climateDayEnd": "2026-01-13T08:00:00+00:00",
-            "climateDayLabel": "2026-01-12",
-        },
-        "data": [
-            {
-                "stid": "SFOC1",
-                "name": "San Francisco",
-                "dateTime": "2026-01-12T20:00:00Z",
-            }
-        ],
+
+# Frozen clocks: 10:00 UTC is past the 09:00 archive gate of each climate day.
+_JAN12_10Z = datetime(2026, 1, 12, 10, 0, tzinfo=timezone.utc)
+_JAN13_10Z = datetime(2026, 1, 13, 10, 0, tzinfo=timezone.utc)
+
+_SAMPLE_PAYLOAD = {
+    "meta": {
+        "generatedAt": "2026-01-12T10:00:00+00:00",
+        "climateDayStart": "2026-01-12T08:00:00+00:00",
+        "climateDayEnd": "2026-01-13T08:00:00+00:00",
+        "climateDayLabel": "2026-01-12",
+    },
+    "data": [
+        {
+            "stid": "SFOC1",
+            "name": "San Francisco",
+            "dateTime": "2026-01-12T20:00:00Z",
+        }
+    ],
+}
+_SAMPLE_PAYLOAD_JSON = _dumps(_SAMPLE_PAYLOAD)
+
+
+@pytest.fixture(scope="module")
+def payload_files(tmp_path_factory):
+    """Write each existing-payload variant once per module; tests hard-link them into place."""
+    root = tmp_path_factory.mktemp("payload_files")
+    variants = {
+        "sample": _SAMPLE_PAYLOAD_JSON,
+        "corrupt": b"{ invalid json }",
+        "missing_meta": _dumps({"data": []}),
+        "missing_label": _dumps({"meta": {"generatedAt": "2026-01-12T10:00:00Z"}, "data": []}),
     }
+    files = {}
+    for name, content in variants.items():
+        files[name] = root / f"{name}.json"
+        files[name].write_bytes(content)
+    return files
+
+
+@pytest.fixture
+def missing_output_path(tmp_path):
+    """Path that is never written, for tests that only exercise the no-file branch."""
+    return tmp_path / "nope.json"
 
 
 class TestFormatDayLabel:
     """Tests for _format_day_label function."""
 
-    def test_format_day_label_utc(self):
-        """Test formatting with UTC datetime."""
-        day_start = datetime(2026, 1, 12, 8, 0, 0, tzinfo=timezone.utc)
-        result = _format_day_label(day_start)
-        # Should convert to Pacific time (00:00 PST = 08:00 UTC)
-        assert result == "2026-01-12"
-
-    def test_format_day_label_different_date(self):
-        """Test formatting with different dates."""
-        day_start1 = datetime(2026, 1, 12, 8, 0, 0, tzinfo=timezone.utc)
-        day_start2 = datetime(2026, 1, 13, 8, 0, 0, tzinfo=timezone.utc)
-        
-        assert _format_day_label(day_start1) == "2026-01-12"
-        assert _format_day_label(day_start2) == "2026-01-13"
+    @pytest.mark.parametrize(
+        "day_start,expected",
+        [
+            # 08:00 UTC is 00:00 PST, so the label is the same calendar day
+            (datetime(2026, 1, 12, 8, 0, 0, tzinfo=timezone.utc), "2026-01-12"),
+            (datetime(2026, 1, 13, 8, 0, 0, tzinfo=timezone.utc), "2026-01-13"),
+            # 07:00 UTC is still the previous evening in Pacific time
+            (datetime(2026, 1, 13, 7, 0, 0, tzinfo=timezone.utc), "2026-01-12"),
+        ],
+    )
+    def test_format_day_label(self, day_start, expected):
+        """Test that labels use the Pacific calendar date."""
+        assert _format_day_label(day_start) == expected
+
+
+class TestParseAsOf:
+    """Tests for _parse_as_of function."""
+
+    @pytest.mark.parametrize("as_of", [None, "", "   ", "\t\n"])
+    def test_blank_values_return_none(self, as_of):
+        """Test that missing or blank overrides fall back to the real clock."""
+        assert _parse_as_of(as_of) is None
+
+    @pytest.mark.parametrize(
+        "as_of",
+        ["2025-12-01T08:00:00Z", "2025-12-01T08:00:00+00:00", "2025-12-01T00:00:00-08:00", "2025-12-01T08:00:00"],
+    )
+    def test_values_normalize_to_utc(self, as_of):
+        """Test that offsets (or no offset) are normalized to UTC."""
+        assert _parse_as_of(as_of) == datetime(2025, 12, 1, 8, 0, tzinfo=timezone.utc)
 
 
 class TestShouldArchive:
     """Tests for _should_archive function."""
 
-    def test_no_existing_file(self, temp_output_dir):
+    @pytest.mark.parametrize(
+        "variant,label,now,expected",
+        [
+            ("sample", "2026-01-12", _JAN12_10Z, False),  # same climate day
+            ("sample", "2026-01-13", _JAN13_10Z, True),  # new climate day
+            ("sample", "2026-01-13", _JAN13_10Z.replace(hour=8, minute=30), False),  # before 09:00 gate
+            ("corrupt", "2026-01-13", _JAN13_10Z, False),
+            ("missing_meta", "2026-01-13", _JAN13_10Z, False),
+            ("missing_label", "2026-01-13", _JAN13_10Z, False),
+        ],
+    )
+    def test_should_archive(self, tmp_path, payload_files, monkeypatch, variant, label, now, expected):
+        """Test archive detection against each existing-payload variant."""
+        output_path = tmp_path / "station_payloads.json"
+        os.link(payload_files[variant], output_path)
+        monkeypatch.setattr(builder, "OUTPUT_PATH", output_path)
+
+        assert _should_archive(label, now) is expected
+
+    def test_no_existing_file(self, missing_output_path, monkeypatch):
         """Test when output file doesn't exist."""
-        with patch('bin.build_station_payloads.OUTPUT_PATH', temp_output_dir / "station_payloads.json"):
-            result = _should_archive("2026-01-13")
-            assert result is False
-
-    def test_same_day_no_archive(self, temp_output_dir, sample_existing_payload):
-        """Test when current day matches existing file - no archive needed."""
-        output_path = temp_output_dir / "station_payloads.json"
-        output_path.write_text(json.dumps(sample_existing_payload), encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            result = _should_archive("2026-01-12")
-            assert result is False
-
-    def test_new_day_archive_needed(self, temp_output_dir, sample_existing_payload):
-        """Test when new day detected - archive is needed."""
-        output_path = temp_output_dir / "station_payloads.json"
-        output_path.write_text(json.dumps(sample_existing_payload), encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            result = _should_archive("2026-01-13")
-            assert result is True
-
-    def test_corrupted_json_no_archive(self, temp_output_dir):
-        """Test when existing file has corrupted JSON."""
-        output_path = temp_output_dir / "station_payloads.json"
-        output_path.write_text("{ invalid json }", encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            result = _should_archive("2026-01-13")
-            assert result is False
-
-    def test_missing_meta_no_archive(self, temp_output_dir):
-        """Test when existing file missing meta data."""
-        output_path = temp_output_dir / "station_payloads.json"
-        output_path.write_text(json.dumps({"data": []}), encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            result = _should_archive("2026-01-13")
-            assert result is False
-
-    def test_missing_climate_day_label(self, temp_output_dir):
-        """Test when existing file missing climateDayLabel."""
-        output_path = temp_output_dir / "station_payloads.json"
-        payload = {"meta": {"generatedAt": "2026-01-12T10:00:00Z"}, "data": []}
-        output_path.write_text(json.dumps(payload), encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            result = _should_archive("2026-01-13")
-            assert result is False
+        monkeypatch.setattr(builder, "OUTPUT_PATH", missing_output_path)
+        assert _should_archive("2026-01-13", _JAN13_10Z) is False
+
+
+@pytest.fixture
+def station_builds(monkeypatch):
+    """Stub the Synoptic fetch and per-type builds; tests queue build_station_payload results."""
+    results = []
+    monkeypatch.setattr(builder, "fetch_synoptic_data", lambda current_time=None: ([], [], []))
+    monkeypatch.setattr(builder, "build_station_payload", lambda *args, **kwargs: results.pop(0) if results else [])
+    return results
 
 
 class TestBuildPayloads:
     """Tests for build_payloads function."""
 
-    @patch('bin.build_station_payloads.fetch_synoptic_data')
-    @patch('bin.build_station_payloads.build_station_payload')
-    def test_build_payloads_structure(self, mock_build_station, mock_fetch):
+    def test_build_payloads_structure(self, station_builds):
         """Test that build_payloads returns correct structure."""
-        # Mock the fetch response
-        mock_fetch.return_value = ([], [], [])
-        
-        # Mock build_station_payload to return empty lists
-        mock_build_station.return_value = []
-        
-        now = datetime(2026, 1, 13, 10, 0, 0, tzinfo=timezone.utc)
-        today_payload = build_payloads(now)
+        today_payload = build_payloads(_JAN13_10Z)
         
         # Verify structure
         assert "meta" in today_payload
@@ -144,34 +161,23 @@ class TestBuildPayloads:
         assert "climateDayEnd" in today_payload["meta"]
         assert "climateDayLabel" in today_payload["meta"]
 
-    @patch('bin.build_station_payloads.fetch_synoptic_data')
-    @patch('bin.build_station_payloads.build_station_payload')
-    def test_build_payloads_time_windows(self, mock_build_station, mock_fetch):
+    def test_build_payloads_time_windows(self, station_builds):
         """Test that correct time windows are used for today."""
-        mock_fetch.return_value = ([], [], [])
-        mock_build_station.return_value = []
-        
-        now = datetime(2026, 1, 13, 10, 0, 0, tzinfo=timezone.utc)
-        today_payload = build_payloads(now)
+        today_payload = build_payloads(_JAN13_10Z)
         
         # Today should be 2026-01-13 08:00 - 2026-01-14 08:00
         assert today_payload["meta"]["climateDayStart"] == "2026-01-13T08:00:00+00:00"
         assert today_payload["meta"]["climateDayEnd"] == "2026-01-14T08:00:00+00:00"
 
-    @patch('bin.build_station_payloads.fetch_synoptic_data')
-    @patch('bin.build_station_payloads.build_station_payload')
-    def test_build_payloads_combines_asos_and_hads(self, mock_build_station, mock_fetch):
+    def test_build_payloads_combines_asos_and_hads(self, station_builds):
         """Test that ASOS and HADS data are combined."""
-        mock_fetch.return_value = ([], [], [])
-        
-        # Mock different return values for ASOS and HADS
-        mock_build_station.side_effect = [
+        # Different results for ASOS and HADS
+        station_builds.extend([
             [{"stid": "ASOS1"}],  # ASOS today
             [{"stid": "HADS1"}],  # HADS today
-        ]
+        ])
         
-        now = datetime(2026, 1, 13, 10, 0, 0, tzinfo=timezone.utc)
-        today_payload = build_payloads(now)
+        today_payload = build_payloads(_JAN13_10Z)
         
         # Verify data is combined
         assert len(today_payload["data"]) == 2
@@ -182,27 +188,36 @@ class TestBuildPayloads:
 class TestOSOCacheYesterday:
     """Tests for OSO cache yesterday integration."""
 
-    @patch('bin.build_station_payloads.fetch_synoptic_data')
-    @patch('bin.build_station_payloads.build_station_payload')
-    @patch('bin.build_station_payloads.USE_DEV_PATHS', True)
-    def test_yesterday_payload_uses_oso_cache_yesterday(
-        self, mock_build_station, mock_fetch, temp_output_dir
-    ):
+    def test_yesterday_payload_uses_oso_cache_yesterday(self, tmp_path, monkeypatch, caplog):
         """Test that yesterday's payload generation uses oso_cache_yesterday.json for OSO stations."""
-        # Setup mock data
-        mock_fetch.return_value = (
-            [{"STID": "KCCR"}],  # stationsA (ASOS)
-            [{"STID": "KCCR"}],  # stationsB (ASOS metadata)
-            [{"STID": "SFOC1"}],  # stationsC (HADS/OSO)
+        calls = []
+
+        def fake_build(*args, **kwargs):
+            calls.append(kwargs)
+            return [{"stid": "TEST"}]
+
+        monkeypatch.setattr(
+            builder,
+            "fetch_synoptic_data",
+            lambda current_time=None: (
+                [{"STID": "KCCR"}],  # stationsA (ASOS)
+                [{"STID": "KCCR"}],  # stationsB (ASOS metadata)
+                [{"STID": "SFOC1"}],  # stationsC (HADS/OSO)
+            ),
         )
-        
-        # Mock return values for build_station_payload
-        mock_build_station.return_value = [{"stid": "TEST"}]
-        
+        monkeypatch.setattr(builder, "build_station_payload", fake_build)
+        monkeypatch.setattr(builder, "USE_DEV_PATHS", True)
+
         # Setup paths
-        output_path = temp_output_dir / "station_payloads.json"
-        yesterday_output_path = temp_output_dir / "station_payloads_yesterday.json"
-        
+        output_path = tmp_path / "station_payloads.json"
+        yesterday_output_path = tmp_path / "station_payloads_yesterday.json"
+        monkeypatch.setattr(builder, "OUTPUT_PATH", output_path)
+        monkeypatch.setattr(builder, "YESTERDAY_OUTPUT_PATH", yesterday_output_path)
+        monkeypatch.setattr(builder, "ROOT_DIR", tmp_path)
+        # No live OSO cache: the archive step is a no-op instead of copying the repo's cache file
+        monkeypatch.setattr(builder, "OSO_CACHE_PATH", tmp_path / "oso_cache.json")
+        monkeypatch.setattr(builder, "OSO_CACHE_YESTERDAY_PATH", tmp_path / "oso_cache_yesterday.json")
+
         # Create existing payload from previous day to trigger archival
         existing_payload = {
             "meta": {
@@ -213,94 +228,89 @@ class TestOSOCacheYesterday:
             },
             "data": [],
         }
-        output_path.write_text(json.dumps(existing_payload), encoding='utf-8')
-        
-        # Patch paths
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path), \
-             patch('bin.build_station_payloads.YESTERDAY_OUTPUT_PATH', yesterday_output_path), \
-             patch('bin.build_station_payloads.ROOT_DIR', temp_output_dir):
-            
-            # Import and run main
-            from bin.build_station_payloads import main
-            
-            # Mock the argument parser to avoid command line args
-            with patch('sys.argv', ['build_station_payloads.py', '--as-of', '2026-02-17T10:00:00Z']):
-                main()
-        
+        output_path.write_bytes(_dumps(existing_payload))
+
+        # Replace the command line so the parser sees only the time override
+        monkeypatch.setattr("sys.argv", ['build_station_payloads.py', '--as-of', '2026-02-17T10:00:00Z'])
+        caplog.set_level(logging.INFO, logger=builder.__name__)
+        builder.main()
+
+        assert any("Generated yesterday's payload" in r.getMessage() for r in caplog.records)
+
         # Verify build_station_payload was called for yesterday's HADS with oso_cache_yesterday
-        # Find the call that was for HADS type yesterday
         hads_calls = [
-            call for call in mock_build_station.call_args_list
-            if call[1].get('type') == 'HADS' and call[1].get('is_current_day') is False
+            kwargs for kwargs in calls
+            if kwargs.get('type') == 'HADS' and kwargs.get('is_current_day') is False
         ]
-        
+
         assert len(hads_calls) == 1, "Should have exactly one HADS call for yesterday"
-        
+
         # Verify the oso_cache_file parameter was passed with yesterday's cache
-        yesterday_call = hads_calls[0]
-        oso_cache_arg = yesterday_call[1].get('oso_cache_file')
-        
+        oso_cache_arg = hads_calls[0].get('oso_cache_file')
+
         assert oso_cache_arg is not None, "oso_cache_file should be passed for yesterday's HADS"
         assert 'oso_cache_yesterday.json' in oso_cache_arg, \
             f"Expected oso_cache_yesterday.json in path, got: {oso_cache_arg}"
+        assert not (tmp_path / "oso_cache_yesterday.json").exists()
 
 
 class TestArchivalWorkflow:
     """Integration tests for the archival workflow."""
 
-    def test_first_run_no_archive(self, temp_output_dir):
+    def test_first_run_no_archive(self, missing_output_path, monkeypatch):
         """Test first run when no existing file exists."""
-        output_path = temp_output_dir / "station_payloads.json"
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            should_archive = _should_archive("2026-01-13")
-            assert should_archive is False
+        monkeypatch.setattr(builder, "OUTPUT_PATH", missing_output_path)
+        now = _JAN13_10Z
+
+        assert _should_archive("2026-01-13", now) is False
 
-    def test_same_day_multiple_runs(self, temp_output_dir, sample_existing_payload):
+    def test_same_day_multiple_runs(self, tmp_path, monkeypatch):
         """Test multiple runs on the same climate day."""
-        output_path = temp_output_dir / "station_payloads.json"
-        output_path.write_text(json.dumps(sample_existing_payload), encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            # First check - same day
-            should_archive = _should_archive("2026-01-12")
-            assert should_archive is False
-            
-            # Second check - still same day
-            should_archive = _should_archive("2026-01-12")
-            assert should_archive is False
-
-    def test_day_transition(self, temp_output_dir, sample_existing_payload):
+        output_path = tmp_path / "station_payloads.json"
+        output_path.write_bytes(_SAMPLE_PAYLOAD_JSON)
+        monkeypatch.setattr(builder, "OUTPUT_PATH", output_path)
+        now = _JAN12_10Z
+
+        # First check - same day
+        assert _should_archive("2026-01-12", now) is False
+
+        # Second check - still same day
+        assert _should_archive("2026-01-12", now) is False
+
+    def test_day_transition(self, tmp_path, monkeypatch):
         """Test detection of day transition."""
-        output_path = temp_output_dir / "station_payloads.json"
-        yesterday_path = temp_output_dir / "station_payloads_yesterday.json"
-        
+        output_path = tmp_path / "station_payloads.json"
+        yesterday_path = tmp_path / "station_payloads_yesterday.json"
+        monkeypatch.setattr(builder, "OUTPUT_PATH", output_path)
+        now = _JAN13_10Z
+
         # Write yesterday's payload
-        output_path.write_text(json.dumps(sample_existing_payload), encoding='utf-8')
-        
-        with patch('bin.build_station_payloads.OUTPUT_PATH', output_path):
-            # Check for new day
-            should_archive = _should_archive("2026-01-13")
-            assert should_archive is True
-            
-            # Simulate the archive
-            if should_archive:
-                shutil.copy2(output_path, yesterday_path)
-                
-                # Create new payload for today
-                new_payload = sample_existing_payload.copy()
-                new_payload["meta"] = sample_existing_payload["meta"].copy()
-                new_payload["meta"]["climateDayLabel"] = "2026-01-13"
-                output_path.write_text(json.dumps(new_payload), encoding='utf-8')
-            
-            # Verify files exist
-            assert output_path.exists()
-            assert yesterday_path.exists()
-            
-            # Verify yesterday file has old date
-            yesterday_data = json.loads(yesterday_path.read_text(encoding='utf-8'))
-            assert yesterday_data["meta"]["climateDayLabel"] == "2026-01-12"
-            
-            # Next check should not trigger archive
-            should_archive_again = _should_archive("2026-01-13")
-            assert should_archive_again is False
+        output_path.write_bytes(_SAMPLE_PAYLOAD_JSON)
+
+        # Check for new day
+        should_archive = _should_archive("2026-01-13", now)
+        assert should_archive is True
+
+        # Simulate the archive
+        if should_archive:
+            # Rename rather than copy or hard-link: a link would share the inode,
+            # so rewriting today's file below would also rewrite yesterday's.
+            output_path.replace(yesterday_path)
+
+            # Create new payload for today
+            new_payload = {
+                "meta": {**_SAMPLE_PAYLOAD["meta"], "climateDayLabel": "2026-01-13"},
+                "data": _SAMPLE_PAYLOAD["data"],
+            }
+            output_path.write_bytes(_dumps(new_payload))
+
+        # Verify files exist
+        assert output_path.exists()
+        assert yesterday_path.exists()
+
+        # Verify yesterday file has old date
+        yesterday_data = json.loads(yesterday_path.read_bytes())
+        assert yesterday_data["meta"]["climateDayLabel"] == "2026-01-12"
+
+        # Next check should not trigger archive
+        assert _should_archive("2026-01-13", now) is False
@@ -1,10 +1,14 @@
 from datetime import datetime, timezone
+import time
 
 import numpy as np
 import pytest
 
 import src.data_processor as dp
 
+_JAN2_00Z = datetime(2024, 1, 2, tzinfo=timezone.utc)
+_JAN2_08Z = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)  # climate day start
+
 
 @pytest.fixture(autouse=True)
 def restore_midnight(monkeypatch):
@@ -17,13 +21,15 @@ def restore_midnight(monkeypatch):
 def test_mm_to_in_and_c_to_f_handle_none_and_values():
     assert dp.mm_to_in(None) is None
     assert dp.mm_to_in(25.4) == pytest.approx(1.0)
+    assert np.isnan(dp.mm_to_in(float("nan")))
+    assert dp.mm_to_in(float("inf")) == float("inf")
     assert dp.c_to_f(None) is None
     assert dp.c_to_f(0) == 32
     assert dp.c_to_f(10) == 50
 
 
 def test_compute_daily_from_cumulative_computes_since_midnight(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     cumulative_obs = [10.0, 12.5]
@@ -37,7 +43,7 @@ def test_compute_daily_from_cumulative_computes_since_midnight(monkeypatch):
 
 
 def test_compute_daily_from_cumulative_returns_none_on_reset(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     cumulative_obs = [5.0, 1.0]
@@ -49,8 +55,26 @@ def test_compute_daily_from_cumulative_returns_none_on_reset(monkeypatch):
     assert dp._compute_daily_from_cumulative(cumulative_obs, timestamps, day_start, day_end) is None
 
 
+def test_compute_daily_from_cumulative_returns_none_on_reset_inside_window():
+    day_start = _JAN2_00Z
+    day_end = day_start + __import__('datetime').timedelta(days=1)
+    timestamps = ["2024-01-01T23:00:00Z", "2024-01-02T02:00:00Z", "2024-01-02T03:00:00Z", "2024-01-02T06:00:00Z"]
+
+    # Endpoints alone (5.0 -> 6.0) would report 1.0 despite the reset to 0.5
+    assert dp._compute_daily_from_cumulative([5.0, 8.0, 0.5, 6.0], timestamps, day_start, day_end) is None
+    # A missing reading between the two sides must not hide the reset
+    assert dp._compute_daily_from_cumulative([5.0, None, 0.5, 6.0], timestamps, day_start, day_end) is None
+    # Sub-tolerance jitter is not a reset
+    assert dp._compute_daily_from_cumulative([5.0, 8.0, 7.9, 9.0], timestamps, day_start, day_end) == pytest.approx(4.0)
+    # An exact one-tip (0.254 mm) drop is not a reset, even where float error overshoots
+    assert dp._compute_daily_from_cumulative([4.318, 4.572, 4.318, 4.826], timestamps, day_start, day_end) == pytest.approx(0.508)
+    assert dp._compute_daily_from_cumulative([20.32, 20.574, 20.32, 20.828], timestamps, day_start, day_end) == pytest.approx(0.508)
+    # A two-tip drop is
+    assert dp._compute_daily_from_cumulative([4.318, 4.826, 4.318, 5.08], timestamps, day_start, day_end) is None
+
+
 def test_compute_precip_from_hourly_daily_filters_and_sums(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     hourly = [0.1, 0.3, 0.5, 1.0]
@@ -68,8 +92,23 @@ def test_compute_precip_from_hourly_daily_filters_and_sums(monkeypatch):
     assert total == pytest.approx(1.8)
 
 
+def test_compute_precip_from_hourly_sorts_unordered_reports():
+    day_start = _JAN2_00Z
+    day_end = day_start + __import__('datetime').timedelta(days=1)
+    hourly = [1.0, 2.0, 3.0, 4.0]
+    timestamps = [
+        "2024-01-02T12:00:00Z",
+        "2024-01-02T09:00:00Z",
+        "2024-01-01T20:00:00Z",  # previous day -> ignored
+        "2024-01-02T10:00:00Z",
+    ]
+
+    total = dp._compute_precip_from_hourly(hourly, timestamps, day_start=day_start, day_end=day_end, period="daily")
+    assert total == pytest.approx(7.0)
+
+
 def test_compute_precip_from_hourly_wateryear_includes_all(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     hourly = [0.1, 0.3, 0.5, 1.0]
@@ -87,8 +126,16 @@ def test_compute_precip_from_hourly_wateryear_includes_all(monkeypatch):
     assert total == pytest.approx(1.8)
 
 
+def test_bisect_times_agrees_for_strings_and_parsed_arrays():
+    timestamps = ["2024-01-01T22:00:00Z", "2024-01-02T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-02T04:00:00Z"]
+    parsed = dp._parse_dt_array(timestamps)
+    for side, expected in (("left", 1), ("right", 3)):
+        assert dp._bisect_times(timestamps, _JAN2_00Z, side=side) == expected
+        assert dp._bisect_times(parsed, _JAN2_00Z, side=side) == expected
+
+
 def test_compute_precip_from_hourly_validates_period():
-    day_start = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    day_start = _JAN2_00Z
     day_end = day_start + __import__('datetime').timedelta(days=1)
     with pytest.raises(ValueError):
         dp._compute_precip_from_hourly([], [], day_start=day_start, day_end=day_end, period="invalid")
@@ -101,7 +148,7 @@ def test_unwrap_cumulative_handles_resets_and_missing():
 
 
 def test_compute_daily_temp_range_uses_hourly_and_6hr(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     times = [
@@ -122,7 +169,7 @@ def test_compute_daily_temp_range_uses_hourly_and_6hr(monkeypatch):
 
 
 def test_format_hads_builds_payload(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     # Use realistic ACIS values that are close to the station observations
     # wy_in from ACIS should be similar to wy_in_station (cumulative precip)
@@ -148,7 +195,7 @@ def test_format_hads_builds_payload(monkeypatch):
         },
     }
 
-    now = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    now = _JAN2_08Z
     day_start, day_end = dp.climate_day_window(now, days_ago=0)
     payload = dp.format_hads(station, day_start=day_start, day_end=day_end, now=now, is_current_day=True)
 
@@ -174,7 +221,7 @@ def test_format_hads_builds_payload(monkeypatch):
 
 
 def test_format_asos_combines_station_data(monkeypatch):
-    midnight = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    midnight = _JAN2_00Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     monkeypatch.setattr(dp, "fetch_xmacis_precip", lambda stid, now: [50.0, 25.0])
 
@@ -207,7 +254,7 @@ def test_format_asos_combines_station_data(monkeypatch):
         },
     }
 
-    now = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    now = _JAN2_08Z
     day_start, day_end = dp.climate_day_window(now, days_ago=0)
     payload = dp.format_asos(station_a, station_b, day_start=day_start, day_end=day_end, now=now, is_current_day=True)
 
@@ -224,8 +271,25 @@ def test_format_asos_combines_station_data(monkeypatch):
     assert payload["percentOfNorm"] == 200
 
 
-def test_build_station_payload_validates_input(monkeypatch):
-    now = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+def test_build_station_payload_injected_hads_formatter_skips_oso(monkeypatch):
+    now = _JAN2_08Z
+    day_start, day_end = dp.climate_day_window(now, days_ago=0)
+
+    def no_oso(*args, **kwargs):
+        raise AssertionError("OSO products should not be parsed for an injected formatter")
+
+    monkeypatch.setattr(dp, "_parse_oso_batch", no_oso)
+
+    # Only the documented keywords are passed; oso/oso_cache_file stay with format_hads
+    def hads_stub(station, *, day_start, day_end, now, is_current_day):
+        return {"stid": station["STID"]}
+
+    result = dp.build_station_payload([{"STID": "SFOC1"}], type="HADS", day_start=day_start, day_end=day_end, now=now, formatter=hads_stub)
+    assert result == [{"stid": "SFOC1"}]
+
+
+def test_build_station_payload_validates_input():
+    now = _JAN2_08Z
     day_start, day_end = dp.climate_day_window(now, days_ago=0)
     
     with pytest.raises(ValueError):
@@ -237,21 +301,56 @@ def test_build_station_payload_validates_input(monkeypatch):
     with pytest.raises(ValueError):
         dp.build_station_payload([{}], [{}, {}], type="ASOS", day_start=day_start, day_end=day_end, now=now)
 
-    monkeypatch.setattr(dp, "format_hads", lambda station, day_start, day_end, now, is_current_day: {"stid": station["STID"]})
-    result = dp.build_station_payload([{"STID": "H1"}], type="HADS", day_start=day_start, day_end=day_end, now=now)
+    def hads_stub(station, **kwargs):
+        return {"stid": station["STID"]}
+
+    def asos_stub(a, b, **kwargs):
+        return {"stid": a["STID"] + b["STID"]}
+
+    result = dp.build_station_payload([{"STID": "H1"}], type="HADS", day_start=day_start, day_end=day_end, now=now, formatter=hads_stub)
     assert result == [{"stid": "H1"}]
 
-    monkeypatch.setattr(dp, "format_asos", lambda a, b, day_start, day_end, now, is_current_day: {"stid": a["STID"] + b["STID"]})
-    result = dp.build_station_payload([{"STID": "A"}], [{"STID": "B"}], type="ASOS", day_start=day_start, day_end=day_end, now=now)
+    result = dp.build_station_payload([{"STID": "A"}], [{"STID": "B"}], type="ASOS", day_start=day_start, day_end=day_end, now=now, formatter=asos_stub)
     assert result == [{"stid": "AB"}]
 
 
+def test_build_station_payload_formats_many_stations_in_order():
+    now = _JAN2_08Z
+    day_start, day_end = dp.climate_day_window(now, days_ago=0)
+    stids = [f"S{i}" for i in range(8)]
+
+    def hads_stub(station, **kwargs):
+        # Earlier stations finish last, so completion order differs from input order
+        time.sleep(0.002 * (len(stids) - int(station["STID"][1:])))
+        return {"stid": station["STID"]}
+
+    def asos_stub(a, b, **kwargs):
+        return {"stid": a["STID"] + b["STID"]}
+
+    result = dp.build_station_payload([{"STID": s} for s in stids], type="HADS", day_start=day_start, day_end=day_end, now=now, formatter=hads_stub)
+    assert [r["stid"] for r in result] == stids
+
+    result = dp.build_station_payload(
+        [{"STID": s} for s in stids], [{"STID": "x"}] * len(stids),
+        type="ASOS", day_start=day_start, day_end=day_end, now=now, formatter=asos_stub,
+    )
+    assert [r["stid"] for r in result] == [s + "x" for s in stids]
+
+    def failing_stub(station, **kwargs):
+        if station["STID"] == "S3":
+            raise RuntimeError("boom")
+        return {"stid": station["STID"]}
+
+    with pytest.raises(RuntimeError, match="boom"):
+        dp.build_station_payload([{"STID": s} for s in stids], type="HADS", day_start=day_start, day_end=day_end, now=now, formatter=failing_stub)
+
+
 def test_climate_day_window_returns_8am_start():
     """Test that climate day starts at 8 AM UTC."""
     now = datetime(2024, 1, 2, 12, 0, tzinfo=timezone.utc)
     start, end = dp.climate_day_window(now, days_ago=0)
     
-    assert start == datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    assert start == _JAN2_08Z
     assert end == datetime(2024, 1, 3, 8, 0, tzinfo=timezone.utc)
 
 
@@ -260,7 +359,7 @@ def test_climate_day_window_yesterday():
     now = datetime(2024, 1, 3, 12, 0, tzinfo=timezone.utc)
     start, end = dp.climate_day_window(now, days_ago=1)
     
-    assert start == datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    assert start == _JAN2_08Z
     assert end == datetime(2024, 1, 3, 8, 0, tzinfo=timezone.utc)
 
 
@@ -292,7 +391,7 @@ def test_load_oso_cache_returns_empty_on_missing_file(tmp_path):
 def test_load_oso_cache_returns_empty_on_corrupt_file(tmp_path):
     """Test that loading corrupt cache returns empty dict."""
     cache_file = tmp_path / "cache.json"
-    cache_file.write_text("not valid json{")
+    cache_file.write_bytes(b"not valid json{")
     result = dp._load_oso_cache(str(cache_file))
     assert result == {}
 
@@ -302,7 +401,7 @@ def test_load_oso_cache_loads_valid_file(tmp_path):
     import json
     cache_file = tmp_path / "cache.json"
     data = {"SFOC1": {"day": "2024-01-02", "max_hi": 20.0, "min_lo": 10.0}}
-    cache_file.write_text(json.dumps(data))
+    cache_file.write_bytes(json.dumps(data).encode())
     
     result = dp._load_oso_cache(str(cache_file))
     assert result == data
@@ -317,7 +416,7 @@ def test_save_oso_cache_writes_json(tmp_path):
     dp._save_oso_cache(str(cache_file), data)
     
     assert cache_file.exists()
-    loaded = json.loads(cache_file.read_text())
+    loaded = json.loads(cache_file.read_bytes())
     assert loaded == data
 
 
@@ -348,7 +447,7 @@ def test_parse_oso_file_returns_yesterday_cache(tmp_path):
             "last_update": "2024-01-01T20:00:00+00:00"
         }
     }
-    yesterday_cache.write_text(json.dumps(cache_data))
+    yesterday_cache.write_bytes(json.dumps(cache_data).encode())
     
     now = datetime(2024, 1, 2, 10, 0, tzinfo=timezone.utc)
     result = dp._parse_oso_file("SFOC1", now, str(tmp_path), is_current_day=False)
@@ -366,7 +465,7 @@ def test_parse_oso_file_returns_none_if_yesterday_cache_missing(tmp_path):
 
 def test_format_hads_with_yesterday_flag(monkeypatch):
     """Test that format_hads correctly uses is_current_day flag for water year calc."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     monkeypatch.setattr(dp, "fetch_xmacis_precip", lambda stid, now: [5.0, 10.0])
     monkeypatch.setattr(dp, "_parse_oso_file", lambda stid, now, home_dir, is_current_day: (None, None))
@@ -388,7 +487,7 @@ def test_format_hads_with_yesterday_flag(monkeypatch):
         },
     }
 
-    now = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    now = _JAN2_08Z
     day_start, day_end = dp.climate_day_window(now, days_ago=1)
     
     # Test with is_current_day=False (yesterday)
@@ -402,7 +501,7 @@ def test_format_hads_with_yesterday_flag(monkeypatch):
 
 def test_format_asos_with_yesterday_flag(monkeypatch):
     """Test that format_asos correctly uses is_current_day flag for water year calc."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     monkeypatch.setattr(dp, "fetch_xmacis_precip", lambda stid, now: [50.0, 25.0])
 
@@ -435,7 +534,7 @@ def test_format_asos_with_yesterday_flag(monkeypatch):
         },
     }
 
-    now = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    now = _JAN2_08Z
     day_start, day_end = dp.climate_day_window(now, days_ago=1)
     
     # Test with is_current_day=False (yesterday)
@@ -447,7 +546,7 @@ def test_format_asos_with_yesterday_flag(monkeypatch):
 
 def test_compute_daily_temp_range_with_oso_hourmax_hourmin(monkeypatch):
     """Test that OSO hourMax/hourMin take priority over Synoptic data."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     times = [
@@ -483,7 +582,7 @@ def test_parse_dt_parses_iso_format():
 
 def test_compute_daily_from_cumulative_with_grace_period(monkeypatch):
     """Test that grace period includes observations up to 30 min after day_end."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
 
     cumulative_obs = [10.0, 12.5, 15.0]
@@ -571,7 +670,7 @@ def test_parse_oso_file_caches_and_updates_max_min(tmp_path, monkeypatch):
             "last_update": "2024-01-02T10:00:00+00:00"
         }
     }
-    cache_file.write_text(json.dumps(initial_cache))
+    cache_file.write_bytes(json.dumps(initial_cache).encode())
     
     # Create OSO file with higher max and lower min
     oso_content = """SA 01021430
@@ -583,7 +682,7 @@ LO 32
     oso_file.write_text(oso_content)
     
     # Mock get_midnight to return consistent climate day
-    midnight = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     
     now = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc)
@@ -627,6 +726,26 @@ LO 45
     assert result == (None, None)
 
 
+def test_parse_oso_batch_updates_cache_for_all_stations(tmp_path, monkeypatch):
+    """Test that a batch parse matches per-station results and writes one shared cache."""
+    import json
+    monkeypatch.setattr(dp, "USE_DEV_PATHS", False)
+    (tmp_path / "SFOOSOSFD").write_text("SA 01021430\nHI 65\nLO 45\nPCPN 0.10\n")
+    (tmp_path / "SFOOSORWC").write_text("SA 01021430\nHI 59\nLO 41\nPCPN 0.00\n")
+
+    now = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc)
+    result = dp._parse_oso_batch(["SFOC1", "RWCC1", "SARC1", "H1"], now, str(tmp_path))
+
+    assert result["SFOC1"][:2] == pytest.approx(((65 - 32) * 5 / 9, (45 - 32) * 5 / 9))
+    assert result["RWCC1"][:2] == pytest.approx(((59 - 32) * 5 / 9, (41 - 32) * 5 / 9))
+    assert result["SARC1"] == (None, None, None, None)  # no product on disk
+    assert result["H1"] == (None, None, None, None)  # not an OSO station
+
+    cache = json.loads((tmp_path / "oso_cache.json").read_bytes())
+    assert set(cache) == {"SFOC1", "RWCC1"}
+    assert dp._parse_oso_file("SFOC1", now, str(tmp_path)) == result["SFOC1"]
+
+
 def test_unwrap_cumulative_handles_all_none():
     """Test unwrap_cumulative with all None values."""
     values = [None, None, None]
@@ -699,7 +818,7 @@ def test_get_precip_from_acis_calculates_percentage(monkeypatch):
 
 def test_compute_precip_from_hourly_handles_empty_data(monkeypatch):
     """Test _compute_precip_from_hourly with no data."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     
     day_start = midnight
@@ -711,7 +830,7 @@ def test_compute_precip_from_hourly_handles_empty_data(monkeypatch):
 
 def test_compute_precip_from_hourly_handles_none_values(monkeypatch):
     """Test _compute_precip_from_hourly filters out None values."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     
     hourly = [None, 0.5, None, 1.0]
@@ -731,7 +850,7 @@ def test_compute_precip_from_hourly_handles_none_values(monkeypatch):
 
 def test_compute_daily_from_cumulative_handles_empty_data():
     """Test _compute_daily_from_cumulative with no data."""
-    day_start = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    day_start = _JAN2_08Z
     day_end = day_start + __import__('datetime').timedelta(days=1)
     
     result = dp._compute_daily_from_cumulative([], [], day_start, day_end)
@@ -740,7 +859,7 @@ def test_compute_daily_from_cumulative_handles_empty_data():
 
 def test_compute_daily_from_cumulative_handles_all_none_values():
     """Test _compute_daily_from_cumulative with all None cumulative values."""
-    day_start = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    day_start = _JAN2_08Z
     day_end = day_start + __import__('datetime').timedelta(days=1)
     
     timestamps = ["2024-01-02T10:00:00Z", "2024-01-02T12:00:00Z"]
@@ -750,7 +869,7 @@ def test_compute_daily_from_cumulative_handles_all_none_values():
 
 def test_compute_daily_temp_range_returns_none_if_no_data():
     """Test _compute_daily_temp_range with no temperature data."""
-    day_start = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    day_start = _JAN2_08Z
     day_end = day_start + __import__('datetime').timedelta(days=1)
     
     result = dp._compute_daily_temp_range(None, [], None, None, day_start=day_start, day_end=day_end)
@@ -759,7 +878,7 @@ def test_compute_daily_temp_range_returns_none_if_no_data():
 
 def test_compute_daily_temp_range_filters_by_time_window(monkeypatch):
     """Test that _compute_daily_temp_range only uses data within the time window."""
-    midnight = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    midnight = _JAN2_08Z
     monkeypatch.setattr(dp, "get_midnight", lambda now=None: midnight)
     
     times = [
@@ -7,6 +7,14 @@ from bin import fetch_xmacis_precip as module
 from lib.xmacis_client import XMACISAPIError
 
 
+@pytest.fixture(autouse=True)
+def clear_fetch_cache():
+    """Each test patches its own XMACIS client, so never reuse a cached summary."""
+    module._fetch_summary.cache_clear()
+    yield
+    module._fetch_summary.cache_clear()
+
+
 def test_load_station_ids_returns_lists(tmp_path):
     config = tmp_path / "stations.yaml"
     config.write_text(
@@ -69,3 +77,20 @@ def test_fetch_xmacis_precip_raises_after_failed_fallback(monkeypatch):
     msg = str(excinfo.value)
     assert "primary='PRIMARY'" in msg
     assert "fallback='FALLBACK'" in msg
+
+
+def test_fetch_xmacis_precip_reuses_summary_for_same_request(monkeypatch):
+    calls = []
+
+    def fake_fetch(self, station, *, start, end):
+        calls.append(station)
+        return {"smry": [7.5, 5.0]}
+
+    monkeypatch.setattr(module.XMACISClient, "fetch_precip_with_normals", fake_fetch)
+    now = datetime(2024, 1, 2, 10, 0, tzinfo=timezone.utc)
+
+    assert module.fetch_xmacis_precip("A1", now=now) == module.fetch_xmacis_precip("A1", now=now.replace(hour=20))
+    module.fetch_xmacis_precip("A2", now=now)
+    module.fetch_xmacis_precip("A1", now=datetime(2024, 1, 3, 10, 0, tzinfo=timezone.utc))
+
+    assert calls == ["A1", "A2", "A1"]
@@ -1,9 +1,14 @@
 """Minimal YAML subset parser for environments without PyYAML."""
 from __future__ import annotations
 
+import sys
 from typing import Any, Union
 
 
+def _unquote(value: str) -> str:
+    return value.strip().strip("'\"")
+
+
 def safe_load(stream: Union[str, bytes]) -> Any:
     if hasattr(stream, "read"):
         text = stream.read()
@@ -14,34 +19,35 @@ def safe_load(stream: Union[str, bytes]) -> Any:
         text = text.decode("utf-8")
 
     data = {}
-    section_name = None
     section_container: dict[str, Any] | None = None
     current_list = None
 
     for raw_line in str(text).splitlines():
-        stripped = raw_line.strip()
-        if not stripped or stripped.startswith("#"):
+        body = raw_line.lstrip(" ")
+        stripped = body.strip()
+        if not stripped or stripped[0] == "#":
             continue
 
-        if not raw_line.startswith(" "):
+        indent = len(raw_line) - len(body)
+
+        if indent == 0:
             # Top-level mapping key
-            section_name = stripped.rstrip(":")
             section_container = {}
-            data[section_name] = section_container
+            data[sys.intern(stripped.rstrip(":"))] = section_container
             current_list = None
             continue
 
         if section_container is None:
             continue
 
-        if raw_line.startswith("  ") and ":" in stripped:
+        if indent >= 2 and ":" in stripped:
             key, rest = stripped.split(":", 1)
-            key = key.strip().strip("'\"")
+            key = sys.intern(_unquote(key))
             rest = rest.strip()
 
             if rest:
-                if rest.startswith("[") and rest.endswith("]"):
-                    items = [item.strip().strip("'\"") for item in rest[1:-1].split(",") if item.strip()]
+                if rest[0] == "[" and rest[-1] == "]":
+                    items = [_unquote(item) for item in rest[1:-1].split(",") if item.strip()]
                     section_container[key] = items
                 else:
                     section_container[key] = rest.strip("'\"")
@@ -51,8 +57,7 @@ def safe_load(stream: Union[str, bytes]) -> Any:
                 section_container[key] = current_list
             continue
 
-        if raw_line.startswith("    -") and current_list is not None:
-            item = stripped.lstrip("-").strip().strip("'\"")
-            current_list.append(item)
+        if indent == 4 and body[0] == "-" and current_list is not None:
+            current_list.append(_unquote(stripped.lstrip("-")))
 
     return data